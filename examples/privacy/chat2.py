@@ -28,6 +28,7 @@ python3 examples/privacy/chat.py
 Use optional arguments to change the settings, e.g.:
 
 -l # use locally running Llama model
+-m vllm # use a (quantized) model served by vLLM, see `vllm_config` below
 -lc 1000 # use local Llama model with context length 1000
     (you typically can set ctx len when spinning up local llm API server)
 -ns # no streaming
@@ -38,6 +39,8 @@ Use optional arguments to change the settings, e.g.:
 For details on running with local Llama model, see:
 https://langroid.github.io/langroid/blog/2023/09/14/using-langroid-with-local-llms/
 """
+import sys
+
 import typer
 from rich import print
 from pydantic import BaseSettings
@@ -52,6 +55,16 @@ from langroid.utils.configuration import set_global, Settings
 from langroid.utils.logging import setup_colored_logging
 
 
+try:
+    # optional: faster (libuv-based) event loop for any async LLM/tool calls
+    import uvloop
+
+    if sys.platform != "win32":
+        uvloop.install()
+except ImportError:
+    pass
+
+
 app = typer.Typer()
 
 setup_colored_logging()
@@ -75,6 +88,20 @@ ooba_config = OobaConfig(
     litellm=False,
     use_completion_for_chat=False,
 )
+# vLLM serves an OpenAI-compatible API, with continuous batching of concurrent
+# requests; launch it with a quantized model, e.g.:
+# python -m vllm.entrypoints.openai.api_server \
+#   --model TheBloke/Llama-2-13B-chat-AWQ --quantization awq --dtype auto \
+#   --max-num-seqs 32
+VLLMConfig = OpenAIGPTConfig.create(prefix="vllm")
+vllm_config = VLLMConfig(
+    chat_model="TheBloke/Llama-2-13B-chat-AWQ",  # must match the served model
+    completion_model="TheBloke/Llama-2-13B-chat-AWQ",
+    api_base="http://localhost:8000/v1",  # <- edit if running at a different port
+    chat_context_length=4096,
+    litellm=False,
+    use_completion_for_chat=False,
+)
 
 
 class CLIOptions(BaseSettings):
@@ -101,6 +128,12 @@ def chat(opts: CLIOptions) -> None:
     elif opts.model.startswith("ollama"):
         llm_config = litellm_ollama_config
         llm_config.chat_model = opts.model
+    elif opts.model.startswith("vllm"):
+        # e.g. "vllm" or "vllm/TheBloke/Llama-2-13B-chat-AWQ"
+        llm_config = vllm_config
+        if "/" in opts.model:
+            llm_config.chat_model = opts.model.split("/", 1)[1]
+            llm_config.completion_model = llm_config.chat_model
     else:
         llm_config = OpenAIGPTConfig()
 
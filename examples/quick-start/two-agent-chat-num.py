@@ -9,23 +9,51 @@ Run as follows:
 
 python3 examples/quick-start/two-agent-chat-num.py
 
+To use a local model served by vLLM, launch its OpenAI-compatible server, e.g.:
+
+python -m vllm.entrypoints.openai.api_server --model mistralai/Mistral-7B-Instruct-v0.2
+
+and point both agents at it:
+
+python3 examples/quick-start/two-agent-chat-num.py \
+    -m mistralai/Mistral-7B-Instruct-v0.2 -ab http://localhost:8000/v1
+
+Use the `-a` option to run the tasks asynchronously. Note that the two agents
+take turns (the Student waits for each answer from the Adder), so their LLM
+requests never overlap: vLLM has no concurrent requests to batch here, and
+`-a` does not speed this example up.
+
 For more explanation see the
 [Getting Started guide](https://langroid.github.io/langroid/quick-start/two-agent-chat-num/)
 """
 
+import asyncio
+import sys
+
 import typer
 
 import langroid as lr
 
+try:
+    # optional: faster (libuv-based) event loop for any async LLM/tool calls
+    import uvloop
+
+    if sys.platform != "win32":
+        uvloop.install()
+except ImportError:
+    pass
+
 app = typer.Typer()
 
 lr.utils.logging.setup_colored_logging()
 
 
-def chat() -> None:
+def chat(model: str = "", api_base: str = "", use_async: bool = False) -> None:
+    # both agents use the same LLM config, hence the same endpoint
     config = lr.ChatAgentConfig(
         llm=lr.language_models.OpenAIGPTConfig(
-            chat_model=lr.language_models.OpenAIChatModel.GPT4,
+            chat_model=model or lr.language_models.OpenAIChatModel.GPT4,
+            api_base=api_base or None,
         ),
         vecdb=None,
     )
@@ -61,7 +89,10 @@ def chat() -> None:
         single_round=True,  # task done after 1 step() with valid response
     )
     student_task.add_sub_task(adder_task)
-    student_task.run()
+    if use_async:
+        asyncio.run(student_task.run_async())
+    else:
+        student_task.run()
 
 
 @app.command()
@@ -69,6 +100,11 @@ def main(
     debug: bool = typer.Option(False, "--debug", "-d", help="debug mode"),
     no_stream: bool = typer.Option(False, "--nostream", "-ns", help="no streaming"),
     nocache: bool = typer.Option(False, "--nocache", "-nc", help="don't use cache"),
+    model: str = typer.Option("", "--model", "-m", help="model name"),
+    api_base: str = typer.Option(
+        "", "--api-base", "-ab", help="API base URL, e.g. of a local vLLM server"
+    ),
+    use_async: bool = typer.Option(False, "--async", "-a", help="run async"),
 ) -> None:
     lr.utils.configuration.set_global(
         lr.utils.configuration.Settings(
@@ -77,7 +113,7 @@ def main(
             stream=not no_stream,
         )
     )
-    chat()
+    chat(model=model, api_base=api_base, use_async=use_async)
 
 
 if __name__ == "__main__":
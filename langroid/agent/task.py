@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import copy
 import logging
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Any,
     Callable,
@@ -219,6 +221,10 @@ class Task:
 
         # other sub_tasks this task can delegate to
         self.sub_tasks: List[Task] = []
+        # sub-tasks that may be run concurrently with each other (see add_sub_task)
+        self.parallel_sub_tasks: Set[Task] = set()
+        # results of parallel sub-tasks already run in the current step
+        self._parallel_results: Dict[Task, Optional[ChatDocument]] = {}
         self.parent_task: Set[Task] = set()
         self.caller: Task | None = None  # which task called this task's `run` method
 
@@ -274,7 +280,7 @@ class Task:
     def _leave(self) -> str:
         return self._indent + "<<<"
 
-    def add_sub_task(self, task: Task | List[Task]) -> None:
+    def add_sub_task(self, task: Task | List[Task], parallel: bool = False) -> None:
         """
         Add a sub-task (or list of subtasks) that this task can delegate
         (or fail-over) to. Note that the sequence of sub-tasks is important,
@@ -283,16 +289,31 @@ class Task:
 
         Args:
             task (Task|List[Task]): sub-task(s) to add
+            parallel (bool): whether the sub-task(s) are independent of each
+                other, and can be run concurrently: when a step reaches a parallel
+                sub-task, it is run together with all later parallel sub-tasks
+                that can respond to the pending message, and the first valid
+                result (in the usual order) is used. Note that this means a
+                parallel sub-task may run even if an earlier one gave a valid
+                response. Parallel sub-tasks must be non-interactive
+                (`interactive=False`), since they run in separate threads and
+                cannot share the console for human input.
         """
 
         if isinstance(task, list):
             for t in task:
-                self.add_sub_task(t)
+                self.add_sub_task(t, parallel=parallel)
             return
         assert isinstance(task, Task), f"added task must be a Task, not {type(task)}"
+        assert not (parallel and task.interactive), (
+            f"parallel sub-task {task.name} must be non-interactive; "
+            "create it with `interactive=False`"
+        )
 
         task.parent_task.add(self)  # add myself to set of parent tasks of `task`
         self.sub_tasks.append(task)
+        if parallel:
+            self.parallel_sub_tasks.add(task)
         self.name_sub_task_map[task.name] = task
         self.responders.append(cast(Responder, task))
         self.responders_async.append(cast(Responder, task))
@@ -541,6 +562,7 @@ class Task:
             # ensures human gets chance at each turn.
             responders.insert(0, Entity.USER)
 
+        self._parallel_results = {}
         found_response = False
         for r in responders:
             self.is_pass_thru = False
@@ -558,6 +580,9 @@ class Task:
                 self.log_message(r, log_doc)
                 continue
             self.human_tried = r == Entity.USER
+            parallel_group = self._parallel_group(r, responders)
+            if len(parallel_group) > 1:
+                self._run_parallel_sub_tasks(parallel_group, turns)
             result = self.response(r, turns)
             self.is_done = self._is_done_response(result, r)
             self.is_pass_thru = PASS in result.content if result else False
@@ -623,6 +648,7 @@ class Task:
             # ensures human gets chance at each turn.
             responders.insert(0, Entity.USER)
 
+        self._parallel_results = {}
         found_response = False
         for r in responders:
             if not self._can_respond(r):
@@ -639,6 +665,9 @@ class Task:
                 self.log_message(r, log_doc)
                 continue
             self.human_tried = r == Entity.USER
+            parallel_group = self._parallel_group(r, responders)
+            if len(parallel_group) > 1:
+                await self._run_parallel_sub_tasks_async(parallel_group, turns)
             result = await self.response_async(r, turns)
             self.is_done = self._is_done_response(result, r)
             self.is_pass_thru = PASS in result.content if result else False
@@ -657,6 +686,64 @@ class Task:
         self._show_pending_message_if_debug()
         return self.pending_message
 
+    def _parallel_group(self, r: Responder, responders: List[Responder]) -> List[Task]:
+        """
+        If `r` is a parallel sub-task not yet run in this step, return it along
+        with all later parallel sub-tasks in `responders` that can respond to
+        the pending message; these can be run concurrently.
+        """
+        if (
+            not isinstance(r, Task)
+            or r not in self.parallel_sub_tasks
+            or r in self._parallel_results
+        ):
+            return []
+        later = responders[responders.index(r) :]
+        return [
+            t
+            for t in later
+            if isinstance(t, Task)
+            and t in self.parallel_sub_tasks
+            and self._can_respond(t)
+        ]
+
+    def _run_parallel_sub_tasks(self, tasks: List[Task], turns: int) -> None:
+        """
+        Run `tasks` concurrently (in threads) on the pending message, and save
+        their results, to be picked up by `response()`.
+        """
+
+        def run(t: Task) -> Optional[ChatDocument]:
+            # each sub-task gets its own copy since `run` may modify the message
+            return t.run(
+                copy.deepcopy(self.pending_message),
+                turns=t.turns if t.turns > 0 else turns,
+                caller=self,
+            )
+
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            results = list(executor.map(run, tasks))
+        self._parallel_results.update(zip(tasks, results))
+
+    async def _run_parallel_sub_tasks_async(
+        self, tasks: List[Task], turns: int
+    ) -> None:
+        """
+        Async version of `_run_parallel_sub_tasks()`: run `tasks` concurrently
+        on the event loop.
+        """
+        results = await asyncio.gather(
+            *[
+                t.run_async(
+                    copy.deepcopy(self.pending_message),
+                    turns=t.turns if t.turns > 0 else turns,
+                    caller=self,
+                )
+                for t in tasks
+            ]
+        )
+        self._parallel_results.update(zip(tasks, results))
+
     def _process_valid_responder_result(
         self,
         r: Responder,
@@ -757,7 +844,9 @@ class Task:
         """
         Sync version of `response_async()`. See `response_async()` for details.
         """
-        if isinstance(e, Task):
+        if isinstance(e, Task) and e in self._parallel_results:
+            result = self._parallel_results[e]
+        elif isinstance(e, Task):
             actual_turns = e.turns if e.turns > 0 else turns
             result = e.run(
                 self.pending_message,
@@ -819,7 +908,9 @@ class Task:
             Optional[ChatDocument]: response to `self.pending_message` from entity if
             valid, None otherwise
         """
-        if isinstance(e, Task):
+        if isinstance(e, Task) and e in self._parallel_results:
+            return self._parallel_results[e]
+        elif isinstance(e, Task):
             actual_turns = e.turns if e.turns > 0 else turns
             result = await e.run_async(
                 self.pending_message,
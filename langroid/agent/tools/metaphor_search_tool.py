@@ -16,8 +16,77 @@ For more information, please refer to the official docs:
 https://metaphor.systems/
 """
 
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
 from langroid.agent.tool_message import ToolMessage
-from langroid.parsing.web_search import metaphor_search
+from langroid.cachedb.redis_cachedb import RedisCache, RedisCacheConfig
+from langroid.parsing.web_search import get_batched_metaphor_client
+from langroid.utils.configuration import settings
+
+CACHE_TTL = 3600  # seconds
+MEMORY_CACHE_SIZE = 256
+
+_redis_cache: Optional[RedisCache] = None
+# (query, num_results) -> (time of search, result), in insertion order
+_memory_cache: Dict[Tuple[str, int], Tuple[float, str]] = {}
+_memory_cache_lock = threading.Lock()
+
+
+def _get_redis_cache() -> Optional[RedisCache]:
+    global _redis_cache
+    if "redis" not in settings.cache_type:
+        return None
+    if _redis_cache is None:
+        _redis_cache = RedisCache(RedisCacheConfig(fake="fake" in settings.cache_type))
+    return _redis_cache
+
+
+def _search(query: str, num_results: int) -> str:
+    # searches (e.g. from several agents) run concurrently over a shared
+    # connection pool
+    search_results = get_batched_metaphor_client().search(query, num_results)
+    # return Title, Link, Summary of each result, separated by two newlines
+    return "\n\n".join([result.rendered for result in search_results])
+
+
+def _redis_cached_search(query: str, num_results: int) -> Tuple[float, str]:
+    """
+    Time of the search and its result, cached in Redis with a TTL
+    if the global cache type is redis.
+    """
+    cache = _get_redis_cache()
+    if cache is None:
+        return time.time(), _search(query, num_results)
+    key = "metaphor:" + hashlib.sha1(f"{query}|{num_results}".encode()).hexdigest()
+    cached = cache.retrieve(key)
+    if isinstance(cached, dict):
+        return cached["time"], cached["result"]
+    searched_at = time.time()
+    result = _search(query, num_results)
+    cache.store(key, dict(time=searched_at, result=result), expire=CACHE_TTL)
+    return searched_at, result
+
+
+def _cached_search(query: str, num_results: int) -> str:
+    """
+    Search results, cached in-process and (if the global cache type is redis)
+    in Redis, both for CACHE_TTL seconds after the search, so repeated
+    identical tool calls skip the search.
+    """
+    key = (query, num_results)
+    with _memory_cache_lock:
+        entry = _memory_cache.get(key)
+    if entry is None or time.time() - entry[0] >= CACHE_TTL:
+        entry = _redis_cached_search(query, num_results)
+        with _memory_cache_lock:
+            _memory_cache.pop(key, None)
+            _memory_cache[key] = entry
+            while len(_memory_cache) > MEMORY_CACHE_SIZE:
+                del _memory_cache[next(iter(_memory_cache))]
+    return entry[1]
 
 
 class MetaphorSearchTool(ToolMessage):
@@ -39,6 +108,6 @@ class MetaphorSearchTool(ToolMessage):
             summaries of each search result, separated by two newlines.
         """
 
-        search_results = metaphor_search(self.query, self.num_results)
-        # return Title, Link, Summary of each result, separated by two newlines
-        return "\n\n".join(str(result) for result in search_results)
+        if not settings.cache:
+            return _search(self.query, self.num_results)
+        return _cached_search(self.query, self.num_results)
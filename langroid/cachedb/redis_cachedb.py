@@ -2,7 +2,7 @@ import json
 import logging
 import os
 from contextlib import AbstractContextManager, contextmanager
-from typing import Any, Dict, List, TypeVar
+from typing import Any, Dict, List, Optional, TypeVar
 
 import fakeredis
 import redis
@@ -86,17 +86,19 @@ class RedisCache(CacheDB):
         with self.redis_client() as client:  # type: ignore
             client.flushall()
 
-    def store(self, key: str, value: Any) -> None:
+    def store(self, key: str, value: Any, expire: Optional[int] = None) -> None:
         """
         Store a value associated with a key.
 
         Args:
             key (str): The key under which to store the value.
             value (Any): The value to store.
+            expire (Optional[int]): Time-to-live of the key in seconds;
+                if None, the key does not expire.
         """
         with self.redis_client() as client:  # type: ignore
             try:
-                client.set(key, json.dumps(value))
+                client.set(key, json.dumps(value), ex=expire)
             except redis.exceptions.ConnectionError:
                 logger.warning("Redis connection error, not storing key/value")
                 return None
@@ -20,6 +20,7 @@ from typing import (
     no_type_check,
 )
 
+import httpx
 import openai
 from httpx import Timeout
 from openai import AsyncOpenAI, OpenAI
@@ -159,6 +160,33 @@ def noop() -> None:
     return None
 
 
+@cache
+def _shared_openai_client(
+    api_key: str,
+    base_url: Optional[str],
+    organization: Optional[str],
+    timeout: int,
+) -> OpenAI:
+    """
+    OpenAI client shared by all OpenAIGPT instances with the same connection
+    settings (e.g. several agents using the same LLM config), so they reuse
+    one pool of keep-alive connections.
+    """
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        organization=organization,
+        timeout=Timeout(timeout),
+        http_client=httpx.Client(
+            # no lower than the SDK's own default limits (which vary across
+            # versions): cap connections as it does, but since the client is
+            # shared, keep up to 100 of them alive
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+            follow_redirects=True,
+        ),
+    )
+
+
 class OpenAICallParams(BaseModel):
     """
     Various params that can be sent to an OpenAI API chat-completion call.
@@ -412,12 +440,14 @@ class OpenAIGPT(LanguageModel):
         # .env file
         # The config.api_key is ignored when not using an OpenAI model
         self.api_key = config.api_key if self.is_openai_chat_model() else "xxx"
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.api_base,
-            organization=self.config.organization,
-            timeout=Timeout(self.config.timeout),
+        self.client = _shared_openai_client(
+            self.api_key,
+            self.api_base,
+            self.config.organization,
+            self.config.timeout,
         )
+        # not shared: an async client's connections are tied to the event loop
+        # they were created in, and e.g. `run_batch_tasks` uses a new loop per call
         self.async_client = AsyncOpenAI(
             api_key=self.api_key,
             organization=self.config.organization,
@@ -754,6 +784,10 @@ class OpenAIGPT(LanguageModel):
         # Use the kwargs as the cache key
         sorted_kwargs_str = str(sorted(kwargs.items()))
         raw_key = f"{fn_name}:{sorted_kwargs_str}"
+        if self.api_base:
+            # local/proxied models often share a placeholder model name
+            # (e.g. "local"), so distinguish them by the endpoint serving them
+            raw_key += f":{self.api_base}"
 
         # Hash the key to a fixed length using SHA256
         hashed_key = hashlib.sha256(raw_key.encode()).hexdigest()
@@ -4,16 +4,77 @@ Utilities for web search.
 NOTE: Using Google Search requires setting the GOOGLE_API_KEY and GOOGLE_CSE_ID
 environment variables in your `.env` file, as explained in the
 [README](https://github.com/langroid/langroid#gear-installation-and-setup).
+
+Fetched page contents are cached in memory for a day. To also cache them on disk
+(shared across processes and runs), install langroid with the `web-cache` extra,
+e.g. `pip install langroid[web-cache]`, which installs `diskcache`.
 """
 
+import asyncio
+import atexit
+import codecs
+import hashlib
+import json
+import logging
 import os
-from typing import Dict, List
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from googleapiclient.discovery import Resource, build
-from requests.models import Response
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads  # type: ignore
+
+try:
+    # optional on-disk cache of fetched page contents, shared across processes
+    import diskcache
+except ImportError:
+    diskcache = None
+
+logger = logging.getLogger(__name__)
+
+# Shared session so that page fetches (possibly from several threads) reuse
+# pooled keep-alive connections instead of doing a new TCP+TLS handshake per URL.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+_CACHE_TTL = 24 * 60 * 60  # seconds, for both cache tiers
+_MEMORY_CACHE_SIZE = 4096
+# (link, max_len) -> (time fetched, text), in insertion order
+_memory_cache: Dict[Tuple[str, int], Tuple[float, str]] = {}
+_memory_cache_lock = threading.Lock()
+# Cap on the bytes of each page downloaded and parsed. Not scaled down with
+# the length of text kept, since a page's <head> (with inline CSS and JS) can
+# take up much of it before any visible text.
+_MAX_BODY_BYTES = 512 * 1024
+_DISK_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "langroid", "web")
+_disk_cache: Any = None
+_disk_cache_lock = threading.Lock()
+
+# The async Metaphor searches below call this endpoint directly (over aiohttp),
+# making the same request as `Metaphor.search` in the `metaphor_python` SDK
+# that `metaphor_search` uses; keep the two in sync when upgrading the SDK.
+METAPHOR_SEARCH_URL = "https://api.metaphor.systems/search"
 
 
 class WebSearchResult:
@@ -28,6 +89,7 @@ class WebSearchResult:
         link: str,
         max_content_length: int = 3500,
         max_summary_length: int = 300,
+        full_content: Optional[str] = None,
     ):
         """
         Args:
@@ -35,26 +97,39 @@ class WebSearchResult:
             link (str): The link to the search result.
             max_content_length (int): The maximum length of the full content.
             max_summary_length (int): The maximum length of the summary.
+            full_content (Optional[str]): Pre-fetched content of the link;
+                if None, the content is fetched when first accessed.
         """
         self.title = title
         self.link = link
         self.max_content_length = max_content_length
         self.max_summary_length = max_summary_length
-        self.full_content = self.get_full_content()
-        self.summary = self.get_summary()
+        self._prefetched_content = full_content
+
+    @cached_property
+    def full_content(self) -> str:
+        return self.get_full_content()
+
+    @cached_property
+    def summary(self) -> str:
+        return self.get_summary()
 
     def get_summary(self) -> str:
         return self.full_content[: self.max_summary_length]
 
     def get_full_content(self) -> str:
-        response: Response = requests.get(self.link)
-        soup: BeautifulSoup = BeautifulSoup(response.text, "lxml")
-        text = " ".join(soup.stripped_strings)
-        return text[: self.max_content_length]
+        if self._prefetched_content is not None:
+            return self._prefetched_content[: self.max_content_length]
+        return _fetch_content(self.link, self.max_content_length)
 
-    def __str__(self) -> str:
+    @cached_property
+    def rendered(self) -> str:
+        """Title, link and summary, formatted once for display (e.g. to an LLM)."""
         return f"Title: {self.title}\nLink: {self.link}\nSummary: {self.summary}"
 
+    def __str__(self) -> str:
+        return self.rendered
+
     def to_dict(self) -> Dict[str, str]:
         return {
             "title": self.title,
@@ -64,33 +139,398 @@ class WebSearchResult:
         }
 
 
-def google_search(query: str, num_results: int = 5) -> List[WebSearchResult]:
+def _get_disk_cache() -> Any:
+    global _disk_cache
+    with _disk_cache_lock:
+        if _disk_cache is None and diskcache is not None:
+            _disk_cache = diskcache.Cache(_DISK_CACHE_DIR)
+        return _disk_cache
+
+
+def _disk_cache_key(link: str, max_len: int) -> str:
+    return hashlib.sha1(f"{link}|{max_len}".encode()).hexdigest()
+
+
+def _fetch_content(link: str, max_len: int) -> str:
+    """
+    Return the visible text of the page at `link`, truncated to `max_len`,
+    or an empty string if the page could not be fetched.
+    """
+    try:
+        return _cached_fetch_content(link, max_len)
+    except requests.RequestException as e:
+        logger.warning(f"Could not fetch {link}: {e}")
+        return ""
+
+
+def _cached_fetch_content(link: str, max_len: int) -> str:
+    """
+    Results of `_fetch_content_uncached`, cached for a day in memory, and on
+    disk if `diskcache` is installed, so repeated links skip the HTTP request
+    and parse. Failed fetches raise, and so are not cached.
+    """
+    key = (link, max_len)
+    with _memory_cache_lock:
+        entry = _memory_cache.get(key)
+    if entry is None or time.time() - entry[0] >= _CACHE_TTL:
+        entry = _disk_cached_fetch_content(link, max_len)
+        with _memory_cache_lock:
+            _memory_cache.pop(key, None)
+            _memory_cache[key] = entry
+            while len(_memory_cache) > _MEMORY_CACHE_SIZE:
+                del _memory_cache[next(iter(_memory_cache))]
+    return entry[1]
+
+
+def _disk_cached_fetch_content(link: str, max_len: int) -> Tuple[float, str]:
+    """Time of the fetch and its result, cached on disk if possible."""
+    cache = _get_disk_cache()
+    if cache is None:
+        return time.time(), _fetch_content_uncached(link, max_len)
+    key = _disk_cache_key(link, max_len)
+    text, expire_time = cache.get(key, expire_time=True)
+    if text is not None:
+        return expire_time - _CACHE_TTL, str(text)
+    fetched_at = time.time()
+    text = _fetch_content_uncached(link, max_len)
+    cache.set(key, text, expire=_CACHE_TTL)
+    return fetched_at, text
+
+
+_NON_WHITESPACE = re.compile(r"\S+")
+
+# lxml parsers can be reused across documents, but not shared between threads
+_parser_local = threading.local()
+
+
+def _html_parser(charset: Optional[str]) -> Optional[etree.HTMLParser]:
+    """
+    Per-thread HTML parser decoding with `charset`, or None if libxml2 does not
+    know it; if `charset` is None, libxml2 detects the encoding itself, from the
+    document's BOM or <meta> charset declaration.
+    """
+    parsers: Dict[
+        Optional[str], Optional[etree.HTMLParser]
+    ] = _parser_local.__dict__.setdefault("parsers", {})
+    if charset not in parsers:
+        try:
+            parsers[charset] = etree.HTMLParser(
+                encoding=charset, recover=True, remove_comments=True, remove_pis=True
+            )
+        except LookupError:
+            parsers[charset] = None
+    return parsers[charset]
+
+
+def _collapse_whitespace(texts: Iterable[str], max_len: int) -> str:
+    """
+    Equivalent to `" ".join(" ".join(texts).split())[:max_len]`, but stops
+    consuming `texts` once `max_len` chars have been collected. Separate texts
+    are always separated by whitespace, as in BeautifulSoup's
+    `" ".join(soup.stripped_strings)`, so that adjacent elements
+    (e.g. `<li>One</li><li>Two</li>`) do not run together.
+    """
+    words: List[str] = []
+    length = -1
+    for text in texts:
+        for match in _NON_WHITESPACE.finditer(text):
+            words.append(match.group())
+            length += len(words[-1]) + 1
+            if length >= max_len:
+                return " ".join(words)[:max_len]
+    return " ".join(words)[:max_len]
+
+
+_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+# in-document encoding declarations, which libxml2 honours by itself
+_DECLARED_CHARSET = re.compile(
+    rb"<meta[^>]+charset\s*=|<\?xml[^>]+encoding\s*=", re.IGNORECASE
+)
+_BOMS = (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+
+def _charset(content_type: str) -> Optional[str]:
+    """Charset label declared in a Content-Type header (as written), or None."""
+    match = _CHARSET.search(content_type)
+    return None if match is None else match.group(1)
+
+
+def _codec_name(charset: str) -> Optional[str]:
+    """Python's name for the codec of `charset`, or None if it is unknown."""
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        return None
+
+
+def _extract_text(body: bytes, max_len: int, charset: Optional[str] = None) -> str:
+    """
+    Return the visible text of an HTML document, with whitespace collapsed,
+    truncated to `max_len`.
+
+    Args:
+        body (bytes): the raw HTML document.
+        max_len (int): maximum length of the returned text.
+        charset (Optional[str]): charset label declared in the Content-Type
+            header, which takes precedence if it is known; otherwise the
+            document's own declaration (BOM or <meta> charset) is used,
+            falling back to utf-8.
+    """
+    if len(body.strip()) == 0:
+        return ""
+    parser = None
+    if charset is not None:
+        # libxml2 knows some charsets only by their usual label (e.g. EUC-KR),
+        # and some only by python's name for them (e.g. koi8_u -> koi8-u)
+        parser = _html_parser(charset)
+        codec = _codec_name(charset)
+        if parser is None and codec is not None:
+            parser = _html_parser(codec)
+            if parser is None:
+                # known only to python
+                body = body.decode(codec, "replace").encode("utf-8")
+                parser = _html_parser("utf-8")
+    if parser is None:
+        declared = body.startswith(_BOMS) or _DECLARED_CHARSET.search(body, 0, 1024)
+        # without a declaration, libxml2 would assume latin-1
+        parser = _html_parser(None if declared else "utf-8")
+    root = etree.fromstring(body, parser)
+    if root is None:
+        return ""
+    etree.strip_elements(root, "script", "style", with_tail=False)
+    return _collapse_whitespace(root.itertext(), max_len)
+
+
+def _fetch_content_uncached(link: str, max_len: int) -> str:
+    """
+    Fetch the page at `link` and return its visible text, truncated to `max_len`.
+    Only the first few hundred KB of the body are downloaded and parsed, since
+    the text is truncated anyway; non-HTML links yield an empty string.
+    """
+    with _SESSION.get(link, stream=True, timeout=(3, 10)) as response:
+        content_type = response.headers.get("Content-Type", "text/html")
+        if "html" not in content_type.lower():
+            return ""
+        # iter_content (unlike response.raw) transparently decodes gzip etc.
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=16 * 1024):
+            body.extend(chunk)
+            if len(body) >= _MAX_BODY_BYTES:
+                break
+    return _extract_text(bytes(body[:_MAX_BODY_BYTES]), max_len, _charset(content_type))
+
+
+async def _afetch_content(
+    session: aiohttp.ClientSession, link: str, max_len: int
+) -> str:
+    """
+    Async version of `_fetch_content`, using the given aiohttp session.
+    Only the on-disk cache tier (if available) is consulted; failed fetches
+    yield an empty string, and are not cached. The blocking disk cache access
+    and HTML parsing run in worker threads, to keep the event loop free.
+    """
+    cache = await asyncio.to_thread(_get_disk_cache)
+    key = _disk_cache_key(link, max_len)
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return str(cached)
+    timeout = aiohttp.ClientTimeout(sock_connect=3, sock_read=10)
+    try:
+        async with session.get(link, timeout=timeout) as response:
+            content_type = response.headers.get("Content-Type", "text/html")
+            if "html" not in content_type.lower():
+                return ""
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(16 * 1024):
+                body.extend(chunk)
+                if len(body) >= _MAX_BODY_BYTES:
+                    break
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # not cached, so the link is retried next time
+        logger.warning(f"Could not fetch {link}: {e}")
+        return ""
+    text = await asyncio.to_thread(
+        _extract_text, bytes(body[:_MAX_BODY_BYTES]), max_len, _charset(content_type)
+    )
+    if cache is not None:
+        await asyncio.to_thread(cache.set, key, text, expire=_CACHE_TTL)
+    return text
+
+
+def _fetch_results(
+    titles_links: List[Tuple[str, str]],
+    max_content_length: int = 3500,
+    max_summary_length: int = 300,
+    prefetch: bool = True,
+) -> List[WebSearchResult]:
+    """
+    Fetch the contents of several links concurrently (the fetches are I/O-bound),
+    and construct the corresponding WebSearchResult objects, in the same order.
+    If `prefetch` is False, nothing is fetched here, and each result fetches
+    its content only when it is first accessed.
+    """
+    if not prefetch:
+        return [
+            WebSearchResult(title, link, max_content_length, max_summary_length)
+            for title, link in titles_links
+        ]
+    if len(titles_links) == 0:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(titles_links), 16)) as executor:
+        contents = list(
+            executor.map(
+                lambda tl: _fetch_content(tl[1], max_content_length), titles_links
+            )
+        )
+    return [
+        WebSearchResult(
+            title,
+            link,
+            max_content_length,
+            max_summary_length,
+            full_content=content,
+        )
+        for (title, link), content in zip(titles_links, contents)
+    ]
+
+
+async def _afetch_results(
+    session: aiohttp.ClientSession,
+    titles_links: List[Tuple[str, str]],
+    max_content_length: int = 3500,
+    max_summary_length: int = 300,
+) -> List[WebSearchResult]:
+    """
+    Async version of `_fetch_results`: fetch all contents concurrently
+    on the event loop, using the given aiohttp session.
+    """
+    contents = await asyncio.gather(
+        *[
+            _afetch_content(session, link, max_content_length)
+            for _, link in titles_links
+        ]
+    )
+    return [
+        WebSearchResult(
+            title,
+            link,
+            max_content_length,
+            max_summary_length,
+            full_content=content,
+        )
+        for (title, link), content in zip(titles_links, contents)
+    ]
+
+
+def _google_service() -> Tuple[Resource, Optional[str]]:
+    """Google Custom Search service, and the search engine (CSE) id."""
     load_dotenv()
     api_key = os.getenv("GOOGLE_API_KEY")
     cse_id = os.getenv("GOOGLE_CSE_ID")
     service: Resource = build("customsearch", "v1", developerKey=api_key)
-    raw_results = (
+    return service, cse_id
+
+
+def _google_raw_results(query: str, num_results: int) -> List[Dict[str, Any]]:
+    service, cse_id = _google_service()
+    raw_results: List[Dict[str, Any]] = (
         service.cse().list(q=query, cx=cse_id, num=num_results).execute()["items"]
     )
+    return raw_results
 
-    return [
-        WebSearchResult(result["title"], result["link"], 3500, 300)
-        for result in raw_results
-    ]
+
+def google_search(
+    query: str, num_results: int = 5, prefetch: bool = True
+) -> List[WebSearchResult]:
+    raw_results = _google_raw_results(query, num_results)
+    return _fetch_results(
+        [(result["title"], result["link"]) for result in raw_results],
+        3500,
+        300,
+        prefetch=prefetch,
+    )
 
 
-def metaphor_search(query: str, num_results: int = 5) -> List[WebSearchResult]:
+def google_search_many(
+    queries: List[Tuple[str, int]], prefetch: bool = True
+) -> List[List[WebSearchResult]]:
     """
-    Method that makes an API call by Metaphor client that queries
-    the top num_results links that matches the query. Returns a list
-    of WebSearchResult objects.
+    Run several Google searches with a single batched HTTP request to the
+    Custom Search API, then fetch the contents of all results concurrently.
 
     Args:
-        query (str): The query body that users wants to make.
-        num_results (int): Number of top matching results that we want
-            to grab
+        queries (List[Tuple[str, int]]): (query, num_results) pairs
+        prefetch (bool): whether to fetch the contents of all results up front;
+            otherwise each result's content is fetched when first accessed.
+
+    Returns:
+        List[List[WebSearchResult]]: the results of each query, in order.
+            A query whose request failed gets no results (and a warning is
+            logged), so that one failure does not discard the results of the
+            other queries; if all of them failed, the first error is raised.
+    """
+    if len(queries) == 0:
+        return []
+    service, cse_id = _google_service()
+    responses: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, Exception] = {}
+
+    def callback(request_id: str, response: Dict[str, Any], exception: Any) -> None:
+        if exception is not None:
+            errors[request_id] = exception
+        else:
+            responses[request_id] = response
+
+    batch = service.new_batch_http_request(callback=callback)
+    for i, (query, num_results) in enumerate(queries):
+        batch.add(
+            service.cse().list(q=query, cx=cse_id, num=num_results),
+            request_id=str(i),
+        )
+    batch.execute()
+    if len(errors) == len(queries):
+        raise errors["0"]
+    for request_id, error in errors.items():
+        logger.warning(
+            f"Google search for {queries[int(request_id)][0]!r} failed: {error}"
+        )
+
+    titles_links = [
+        [
+            (result["title"], result["link"])
+            for result in responses.get(str(i), {}).get("items", [])
+        ]
+        for i in range(len(queries))
+    ]
+    # fetch contents of all results of all queries in one go
+    all_results = _fetch_results(
+        [tl for tls in titles_links for tl in tls], 3500, 300, prefetch=prefetch
+    )
+    results: List[List[WebSearchResult]] = []
+    start = 0
+    for tls in titles_links:
+        results.append(all_results[start : start + len(tls)])
+        start += len(tls)
+    return results
+
+
+async def agoogle_search(query: str, num_results: int = 5) -> List[WebSearchResult]:
+    """
+    Async version of `google_search`: the (blocking) Google API call runs in a
+    worker thread, and the result pages are fetched concurrently with aiohttp.
     """
+    raw_results = await asyncio.to_thread(_google_raw_results, query, num_results)
+    async with aiohttp.ClientSession() as session:
+        return await _afetch_results(
+            session,
+            [(result["title"], result["link"]) for result in raw_results],
+            3500,
+            300,
+        )
 
+
+def _metaphor_api_key() -> str:
     load_dotenv()
 
     api_key = os.getenv("METAPHOR_API_KEY")
@@ -101,6 +541,27 @@ def metaphor_search(query: str, num_results: int = 5) -> List[WebSearchResult]:
             Please set the METAPHOR_API_KEY environment variable.
             """
         )
+    return api_key
+
+
+def metaphor_search(
+    query: str, num_results: int = 5, prefetch: bool = True
+) -> List[WebSearchResult]:
+    """
+    Method that makes an API call by Metaphor client that queries
+    the top num_results links that matches the query. Returns a list
+    of WebSearchResult objects.
+
+    Args:
+        query (str): The query body that users wants to make.
+        num_results (int): Number of top matching results that we want
+            to grab
+        prefetch (bool): whether to fetch the contents of all results
+            concurrently up front; otherwise each result's content is
+            fetched lazily, when first accessed.
+    """
+
+    api_key = _metaphor_api_key()
 
     try:
         from metaphor_python import Metaphor
@@ -120,6 +581,122 @@ def metaphor_search(query: str, num_results: int = 5) -> List[WebSearchResult]:
     )
     raw_results = response.results
 
-    return [
-        WebSearchResult(result.title, result.url, 3500, 300) for result in raw_results
-    ]
+    return _fetch_results(
+        [(result.title, result.url) for result in raw_results],
+        3500,
+        300,
+        prefetch=prefetch,
+    )
+
+
+async def _ametaphor_search(
+    session: aiohttp.ClientSession, query: str, num_results: int
+) -> List[WebSearchResult]:
+    api_key = _metaphor_api_key()
+    async with session.post(
+        METAPHOR_SEARCH_URL,
+        json={"query": query, "numResults": num_results},
+        headers={"x-api-key": api_key},
+    ) as response:
+        response.raise_for_status()
+        raw_results = _json_loads(await response.read())["results"]
+    return await _afetch_results(
+        session,
+        [(result["title"], result["url"]) for result in raw_results],
+        3500,
+        300,
+    )
+
+
+async def ametaphor_search(query: str, num_results: int = 5) -> List[WebSearchResult]:
+    """
+    Async version of `metaphor_search`, for callers already inside an event
+    loop. Calls the Metaphor search API directly, and fetches the result pages
+    concurrently, all over a single aiohttp session.
+
+    Args:
+        query (str): The query body that users wants to make.
+        num_results (int): Number of top matching results that we want
+            to grab
+    """
+    async with aiohttp.ClientSession() as session:
+        return await _ametaphor_search(session, query, num_results)
+
+
+class BatchedMetaphorClient:
+    """
+    Client that runs Metaphor searches submitted from any thread concurrently
+    (at most MAX_CONCURRENT at a time), over a single shared aiohttp session,
+    on its own background event loop. This lets searches from several agents
+    reuse pooled connections.
+    """
+
+    MAX_CONCURRENT = 8
+
+    def __init__(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._lock = threading.Lock()
+        self._closed = False
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    async def _start(self) -> None:
+        # created here so they are bound to the background loop
+        self._session = aiohttp.ClientSession()
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT)
+
+    async def _search(self, query: str, num_results: int) -> List[WebSearchResult]:
+        async with self._semaphore:
+            return await _ametaphor_search(self._session, query, num_results)
+
+    def _submit(self, query: str, num_results: int) -> Future[List[WebSearchResult]]:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchedMetaphorClient is closed")
+            return asyncio.run_coroutine_threadsafe(
+                self._search(query, num_results), self._loop
+            )
+
+    def search(self, query: str, num_results: int = 5) -> List[WebSearchResult]:
+        """Submit a search, and block until it completes."""
+        return self._submit(query, num_results).result()
+
+    async def asearch(self, query: str, num_results: int = 5) -> List[WebSearchResult]:
+        """Submit a search, and await its result."""
+        return await asyncio.wrap_future(self._submit(query, num_results))
+
+    def close(self) -> None:
+        """
+        Cancel any pending searches (whose callers get a CancelledError),
+        close the shared session and stop the background loop.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        async def _close() -> None:
+            # every other task on this (private) loop is a submitted search
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._session.close()
+
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_batched_metaphor_client: Optional[BatchedMetaphorClient] = None
+_batched_metaphor_client_lock = threading.Lock()
+
+
+def get_batched_metaphor_client() -> BatchedMetaphorClient:
+    """Return the process-wide BatchedMetaphorClient, creating it if needed."""
+    global _batched_metaphor_client
+    with _batched_metaphor_client_lock:
+        if _batched_metaphor_client is None:
+            _batched_metaphor_client = BatchedMetaphorClient()
+            atexit.register(_batched_metaphor_client.close)
+        return _batched_metaphor_client
@@ -1,3 +1,4 @@
+import hashlib
 import warnings
 
 import openai
@@ -186,3 +187,34 @@ def test_model_selection(test_settings: Settings):
     check_warning(llm, False)
 
     lr.language_models.openai_gpt.defaultOpenAIChatModel = defaultOpenAIChatModel
+
+
+@pytest.mark.unit
+def test_cache_key_api_base(monkeypatch: pytest.MonkeyPatch):
+    """
+    Responses from different endpoints serving the same model name are cached
+    under different keys, while keys for the default endpoint are unchanged.
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    kwargs = dict(model="local-model", messages=[{"role": "user", "content": "hi"}])
+
+    def cache_key(api_base: str | None) -> str:
+        llm = OpenAIGPT(
+            OpenAIGPTConfig(
+                chat_model="local-model",
+                api_base=api_base,
+                cache_config=RedisCacheConfig(fake=True),
+            )
+        )
+        return llm._cache_lookup("Chat.create", **kwargs)[0]
+
+    key_a = cache_key("http://localhost:8000/v1")
+    key_b = cache_key("http://localhost:8001/v1")
+    assert key_a != key_b
+    assert key_a == cache_key("http://localhost:8000/v1")
+    # same key as before the api_base was included
+    old_key = hashlib.sha256(
+        f"Chat.create:{sorted(kwargs.items())}".encode()
+    ).hexdigest()
+    assert cache_key(None) == old_key
+    assert cache_key(None) not in (key_a, key_b)
@@ -0,0 +1,69 @@
+"""
+Offline tests of the result cache of MetaphorSearchTool, with the actual
+search stubbed out.
+"""
+import uuid
+from typing import Iterator, List, Tuple
+
+import pytest
+
+import langroid.agent.tools.metaphor_search_tool as mst
+from langroid.agent.tools.metaphor_search_tool import MetaphorSearchTool
+from langroid.utils.configuration import Settings, set_global, settings
+
+
+@pytest.fixture
+def searches(monkeypatch: pytest.MonkeyPatch) -> Iterator[List[Tuple[str, int]]]:
+    """Record the (stubbed) searches that are actually run."""
+    calls: List[Tuple[str, int]] = []
+
+    def search(query: str, num_results: int) -> str:
+        calls.append((query, num_results))
+        return f"results for {query} ({len(calls)})"
+
+    monkeypatch.setattr(mst, "_search", search)
+    monkeypatch.setattr(mst, "_memory_cache", {})
+    monkeypatch.setattr(mst, "_redis_cache", None)
+    old_settings = settings.copy()
+    yield calls
+    set_global(old_settings)
+
+
+@pytest.mark.unit
+# with "momento", the tool only has its in-memory cache
+@pytest.mark.parametrize("cache_type", ["fakeredis", "momento"])
+def test_metaphor_search_cache(
+    searches: List[Tuple[str, int]], cache_type: str
+) -> None:
+    set_global(Settings(cache=True, cache_type=cache_type))
+    query = f"query {uuid.uuid4()}"  # avoid hits from earlier runs in fakeredis
+
+    first = MetaphorSearchTool(query=query, num_results=3).handle()
+    assert first == f"results for {query} (1)"
+    # hit
+    assert MetaphorSearchTool(query=query, num_results=3).handle() == first
+    assert len(searches) == 1
+    # miss: different arguments
+    MetaphorSearchTool(query=query, num_results=4).handle()
+    assert searches == [(query, 3), (query, 4)]
+
+    # in-memory entries expire after CACHE_TTL
+    searched_at, result = mst._memory_cache[(query, 3)]
+    mst._memory_cache[(query, 3)] = (searched_at - mst.CACHE_TTL - 1, result)
+    expired = MetaphorSearchTool(query=query, num_results=3).handle()
+    if cache_type == "fakeredis":
+        # still in redis, which expires it by itself
+        assert expired == first
+        assert len(searches) == 2
+    else:
+        assert expired == f"results for {query} (3)"
+        assert len(searches) == 3
+
+
+@pytest.mark.unit
+def test_metaphor_search_no_cache(searches: List[Tuple[str, int]]) -> None:
+    set_global(Settings(cache=False, cache_type="fakeredis"))
+    for _ in range(2):
+        MetaphorSearchTool(query="no cache", num_results=3).handle()
+    assert len(searches) == 2
+    assert len(mst._memory_cache) == 0
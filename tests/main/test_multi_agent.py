@@ -1,8 +1,10 @@
-from typing import Optional
+import time
+from typing import List, Optional, Tuple
 
 import pytest
 
 from langroid.agent.chat_agent import ChatAgent, ChatAgentConfig
+from langroid.agent.chat_document import ChatDocMetaData, ChatDocument
 from langroid.agent.task import Task
 from langroid.cachedb.redis_cachedb import RedisCacheConfig
 from langroid.language_models.base import Role
@@ -290,3 +292,120 @@ def test_multi_agent_no_answer(test_settings: Settings):
     task_a.agent.clear_history(0)
     result = task_a.run(turns=2)
     assert NO_ANSWER in result.content
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_multi_agent_parallel_sub_tasks(test_settings: Settings, parallel: bool):
+    """
+    Test that when the first sub-task returns NO_ANSWER, the response of the
+    next sub-task is used, whether or not the sub-tasks are run in parallel.
+    """
+    set_global(test_settings)
+    agent_a = ChatAgent(_TestChatAgentConfig(name="A"))
+    agent_b = ChatAgent(_TestChatAgentConfig(name="B"))
+    agent_c = ChatAgent(_TestChatAgentConfig(name="C"))
+
+    task_a = Task(
+        agent_a,
+        interactive=False,
+        system_message="Your job is to always ask 'Who are you?'",
+        user_message="Start by asking 'Who are you?'",
+    )
+    task_b = Task(
+        agent_b,
+        system_message=f"your job is to always say '{NO_ANSWER}'",
+        interactive=False,
+        done_if_response=[Entity.LLM],
+    )
+    C_RESPONSE = "hello I am C"
+    task_c = Task(
+        agent_c,
+        system_message=f"your job is to always say '{C_RESPONSE}'",
+        interactive=False,
+        done_if_response=[Entity.LLM],
+    )
+
+    task_a.add_sub_task([task_b, task_c], parallel=parallel)
+    assert (task_b in task_a.parallel_sub_tasks) == parallel
+    task_a.init()
+    # LLM asks
+    task_a.step()
+    # B says NO_ANSWER, so C's reply is used
+    task_a.step()
+    assert C_RESPONSE.lower() in task_a.pending_message.content.lower()
+
+
+class _SlowAgent(ChatAgent):
+    """
+    LLM-less agent that takes a while to give a fixed response, and records
+    when it started and finished.
+    """
+
+    def __init__(
+        self, name: str, reply: str, log: List[Tuple[str, float, float]]
+    ) -> None:
+        super().__init__(ChatAgentConfig(name=name, llm=None, vecdb=None))
+        self.reply = reply
+        self.log = log
+
+    def agent_response(
+        self, msg: Optional[str | ChatDocument] = None
+    ) -> Optional[ChatDocument]:
+        start = time.time()
+        time.sleep(0.3)
+        self.log.append((self.config.name, start, time.time()))
+        return ChatDocument(
+            content=self.reply,
+            metadata=ChatDocMetaData(sender=Entity.AGENT, sender_name=self.config.name),
+        )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("parallel", [True, False])
+@pytest.mark.parametrize("b_reply", [NO_ANSWER, "hello from B"])
+def test_parallel_sub_tasks_concurrency(parallel: bool, b_reply: str):
+    """
+    Test that parallel sub-tasks run concurrently, and that the result of a
+    later sub-task is used only if an earlier one has no valid response.
+    """
+    log: List[Tuple[str, float, float]] = []
+    task_a = Task(
+        ChatAgent(ChatAgentConfig(name="A", llm=None, vecdb=None)),
+        interactive=False,
+    )
+    task_b, task_c = [
+        Task(
+            _SlowAgent(name, reply, log),
+            interactive=False,
+            done_if_response=[Entity.AGENT],
+        )
+        for name, reply in [("B", b_reply), ("C", "hello from C")]
+    ]
+    task_a.add_sub_task([task_b, task_c], parallel=parallel)
+    task_a.init("hi")
+    task_a.step()
+
+    expected = "hello from C" if b_reply == NO_ANSWER else b_reply
+    assert task_a.pending_message.content == expected
+    runs = {name: (start, end) for name, start, end in log}
+    if parallel:
+        # C runs (concurrently with B) even if B responds
+        assert runs.keys() == {"B", "C"}
+        assert runs["B"][0] < runs["C"][1] and runs["C"][0] < runs["B"][1]
+    elif b_reply == NO_ANSWER:
+        # C runs only after B fails to respond
+        assert runs["B"][1] <= runs["C"][0]
+    else:
+        assert runs.keys() == {"B"}
+
+
+@pytest.mark.unit
+def test_parallel_sub_task_must_be_non_interactive():
+    task_a = Task(
+        ChatAgent(ChatAgentConfig(name="A", llm=None, vecdb=None)),
+        interactive=False,
+    )
+    task_b = Task(ChatAgent(ChatAgentConfig(name="B", llm=None, vecdb=None)))
+    with pytest.raises(AssertionError):
+        task_a.add_sub_task(task_b, parallel=True)
+    task_a.add_sub_task(task_b)
@@ -19,6 +19,15 @@ def test_fake_store_and_retrieve(fake_redis_cache):
     assert result == data
 
 
+@pytest.mark.unit
+def test_fake_store_with_expiry(fake_redis_cache):
+    key = "test_expiring_key"
+    fake_redis_cache.store(key, "value", expire=60)
+    assert fake_redis_cache.retrieve(key) == "value"
+    with fake_redis_cache.redis_client() as client:
+        assert 0 < client.ttl(key) <= 60
+
+
 @pytest.fixture
 def real_redis_cache():
     config = RedisCacheConfig(
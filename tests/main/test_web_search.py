@@ -0,0 +1,483 @@
+"""
+Offline tests of the page-parsing helpers in `langroid.parsing.web_search`.
+"""
+import asyncio
+import codecs
+import json
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+import pytest
+import requests
+from aiohttp import web
+from bs4 import BeautifulSoup
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpMockSequence
+
+import langroid.parsing.web_search as ws
+from langroid.parsing.web_search import _charset, _collapse_whitespace, _extract_text
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("max_len", [1, 5, 11, 12, 13, 20, 100])
+@pytest.mark.parametrize(
+    "texts",
+    [
+        [],
+        ["   "],
+        ["hello world!"],  # 12 chars
+        ["  hello \n\t world!  "],
+        ["hel", "lo", " wor", "ld!"],  # words split across nodes
+        ["hello ", "\n", " world!", "", "  more\ttext  here "],
+        ["a" * 30, "b c"],
+    ],
+)
+def test_collapse_whitespace(texts: List[str], max_len: int) -> None:
+    expected = " ".join(" ".join(texts).split())[:max_len]
+    assert _collapse_whitespace(iter(texts), max_len) == expected
+    # joined into a single node
+    assert _collapse_whitespace([" ".join(texts)], max_len) == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("max_len", [5, 12, 3500])
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<ul><li>One</li><li>Two</li><li>Three</li></ul>",
+        "<h1>Title</h1><p>Para</p><p>Another para</p>",
+        "<div>a<br>b</div><table><tr><td>c</td><td>d</td></tr></table>",
+        "<p><b>Hel</b>lo <i>wor</i>ld</p>",
+        "<html><head><title>T</title><style>p {}</style></head>"
+        "<body><script>var x;</script>\n  <p>  spaced\n\ttext </p></body></html>",
+    ],
+)
+def test_extract_text_matches_beautifulsoup(html: str, max_len: int) -> None:
+    # BeautifulSoup's text, with whitespace within each string collapsed too
+    texts = BeautifulSoup(html, "lxml").stripped_strings
+    expected = " ".join(" ".join(texts).split())[:max_len]
+    assert _extract_text(html.encode(), max_len) == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "content_type, expected",
+    [
+        ("text/html; charset=UTF-8", "UTF-8"),
+        ('text/html; charset="windows-1252"', "windows-1252"),
+        ("text/html;charset=shift_jis", "shift_jis"),
+        ("text/html; charset=EUC-KR", "EUC-KR"),
+        ("text/html", None),
+    ],
+)
+def test_charset(content_type: str, expected: Optional[str]) -> None:
+    assert _charset(content_type) == expected
+
+
+LATIN = "café naïve"
+JAPANESE = "日本語"
+KOREAN = "한국어"
+UKRAINIAN = "Привіт, світе"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "body, charset, expected",
+    [
+        # charset only in the Content-Type header
+        (f"<html><body>{LATIN}</body></html>".encode("cp1252"), "cp1252", LATIN),
+        (
+            f"<html><body>{JAPANESE}</body></html>".encode("shift_jis"),
+            "shift_jis",
+            JAPANESE,
+        ),
+        # labels known to libxml2 only as written
+        (
+            f"<html><body>{KOREAN}</body></html>".encode("euc-kr"),
+            "EUC-KR",
+            KOREAN,
+        ),
+        (
+            f"<html><body>{JAPANESE}</body></html>".encode("euc-jp"),
+            "EUC-JP",
+            JAPANESE,
+        ),
+        # known to libxml2 only by python's name for it (koi8-u)
+        (
+            f"<html><body>{UKRAINIAN}</body></html>".encode("koi8_u"),
+            "koi8_u",
+            UKRAINIAN,
+        ),
+        # known only to python
+        (f"<html><body>{LATIN}</body></html>".encode("mac_roman"), "mac_roman", LATIN),
+        # unknown: as if undeclared
+        (f"<html><body>{LATIN}</body></html>".encode(), "no-such-charset", LATIN),
+        # charset only in the document
+        (
+            f"<html><head><meta charset='windows-1252'></head>"
+            f"<body>{LATIN}</body></html>".encode("cp1252"),
+            None,
+            LATIN,
+        ),
+        (
+            f'<html><head><meta http-equiv="Content-Type" '
+            f'content="text/html; charset=Shift_JIS"></head>'
+            f"<body>{JAPANESE}</body></html>".encode("shift_jis"),
+            None,
+            JAPANESE,
+        ),
+        (
+            codecs.BOM_UTF8 + f"<html><body>{JAPANESE}</body></html>".encode(),
+            None,
+            JAPANESE,
+        ),
+        # no declaration at all: utf-8
+        (
+            f"<html><body>{LATIN} {JAPANESE}</body></html>".encode(),
+            None,
+            f"{LATIN} {JAPANESE}",
+        ),
+        # the header takes precedence over the document
+        (
+            f"<html><head><meta charset='shift_jis'></head>"
+            f"<body>{LATIN}</body></html>".encode("utf-8"),
+            "utf-8",
+            LATIN,
+        ),
+        (b"  ", None, ""),
+    ],
+)
+def test_extract_text_encoding(
+    body: bytes, charset: Optional[str], expected: str
+) -> None:
+    assert _extract_text(body, 1000, charset) == expected
+
+
+@pytest.fixture
+def disk_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Any:
+    """
+    Fresh page caches: in memory, and on disk under `tmp_path`
+    (None if diskcache is not installed).
+    """
+    cache = None if ws.diskcache is None else ws.diskcache.Cache(str(tmp_path))
+    monkeypatch.setattr(ws, "_disk_cache", cache)
+    monkeypatch.setattr(ws, "_memory_cache", {})
+    return cache
+
+
+@pytest.mark.unit
+def test_fetch_failure_not_cached(
+    monkeypatch: pytest.MonkeyPatch, disk_cache: Any
+) -> None:
+    fetched: List[str] = []
+
+    def fetch(link: str, max_len: int) -> str:
+        fetched.append(link)
+        raise requests.ConnectionError("connection refused")
+
+    monkeypatch.setattr(ws, "_fetch_content_uncached", fetch)
+    link = "http://example.com/"
+    for _ in range(2):
+        results = ws._fetch_results([("title", link), ("title", link)])
+        assert [r.full_content for r in results] == ["", ""]
+    # each failed fetch is retried
+    assert fetched == [link] * 4
+    assert len(ws._memory_cache) == 0
+    if disk_cache is not None:
+        assert len(disk_cache) == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_afetch_failure(disk_cache: Any) -> None:
+    link = "http://127.0.0.1:1/"  # nothing listens on port 1
+    async with aiohttp.ClientSession() as session:
+        results = await ws._afetch_results(session, [("title", link)])
+    assert results[0].full_content == ""
+    if disk_cache is not None:
+        assert len(disk_cache) == 0
+
+
+class _FakeResponse:
+    """Streamed response to a `requests` GET, with the given HTML body."""
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.headers = {"Content-Type": "text/html; charset=utf-8"}
+
+    def __enter__(self) -> "_FakeResponse":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i : i + chunk_size]
+
+
+@pytest.mark.unit
+def test_fetch_content_heavy_head(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Visible text after a large <style>/<script> prefix is still found."""
+    body = (
+        "<html><head><style>"
+        + "p.x { color: red; }\n" * 5000
+        + "</style><script>"
+        + "var x = 1;\n" * 10000
+        + "</script></head><body><p>The visible text.</p></body></html>"
+    ).encode()
+    assert len(body) > 200 * 1024
+    monkeypatch.setattr(ws._SESSION, "get", lambda link, **kw: _FakeResponse(body))
+    assert ws._fetch_content_uncached("http://example.com", 3500) == "The visible text."
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_afetch_content_off_loop(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Disk cache access and parsing do not run on the event loop's thread."""
+    diskcache = pytest.importorskip("diskcache")
+    threads: List[Tuple[str, int]] = []
+
+    class Cache(diskcache.Cache):  # type: ignore
+        def get(self, *args: Any, **kwargs: Any) -> Any:
+            threads.append(("get", threading.get_ident()))
+            return super().get(*args, **kwargs)
+
+        def set(self, *args: Any, **kwargs: Any) -> Any:
+            threads.append(("set", threading.get_ident()))
+            return super().set(*args, **kwargs)
+
+    def extract_text(*args: Any) -> str:
+        threads.append(("parse", threading.get_ident()))
+        return _extract_text(*args)
+
+    monkeypatch.setattr(ws, "_disk_cache", Cache(str(tmp_path)))
+    monkeypatch.setattr(ws, "_extract_text", extract_text)
+
+    async def page(request: web.Request) -> web.Response:
+        return web.Response(text="<p>hello</p>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore
+    try:
+        async with aiohttp.ClientSession() as session:
+            link = f"http://127.0.0.1:{port}/"
+            assert await ws._afetch_content(session, link, 100) == "hello"
+            # cached on disk
+            assert await ws._afetch_content(session, link, 100) == "hello"
+    finally:
+        await runner.cleanup()
+    assert [op for op, _ in threads] == ["get", "parse", "set", "get"]
+    assert threading.get_ident() not in {thread for _, thread in threads}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("disk", [False, True])
+def test_fetch_content_cache(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, disk: bool
+) -> None:
+    fetched: List[str] = []
+
+    def fetch(link: str, max_len: int) -> str:
+        fetched.append(link)
+        return f"content of {link}"
+
+    monkeypatch.setattr(ws, "_fetch_content_uncached", fetch)
+    monkeypatch.setattr(ws, "_memory_cache", {})
+    if disk:
+        diskcache = pytest.importorskip("diskcache")
+        monkeypatch.setattr(ws, "_disk_cache", diskcache.Cache(str(tmp_path)))
+    else:
+        monkeypatch.setattr(ws, "_get_disk_cache", lambda: None)
+
+    link = "http://example.com/page"
+    assert ws._fetch_content(link, 100) == f"content of {link}"
+    assert ws._fetch_content(link, 100) == f"content of {link}"
+    assert fetched == [link]
+
+    # once the in-memory entry expires, it is refetched, unless it is on disk
+    fetched_at, text = ws._memory_cache[(link, 100)]
+    ws._memory_cache[(link, 100)] = (fetched_at - ws._CACHE_TTL, text)
+    assert ws._fetch_content(link, 100) == f"content of {link}"
+    assert fetched == [link] * (1 if disk else 2)
+    # an entry loaded from disk expires in memory when it does on disk
+    assert ws._memory_cache[(link, 100)][0] == pytest.approx(fetched_at, abs=1)
+
+
+def _batch_response(parts: List[Tuple[int, Any]]) -> Tuple[Dict[str, str], str]:
+    """
+    Response to a batch request to a Google API, with one (status, json body)
+    part per request, in reverse order, to check matching by request id.
+    """
+    boundary = "batch_boundary"
+    body = ""
+    for request_id, (status, content) in reversed(list(enumerate(parts))):
+        body += (
+            f"--{boundary}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <response-batch + {request_id}>\r\n\r\n"
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            "Content-Type: application/json\r\n\r\n"
+            f"{json.dumps(content)}\r\n"
+        )
+    body += f"--{boundary}--\r\n"
+    headers = {
+        "status": "200",
+        "content-type": f"multipart/mixed; boundary={boundary}",
+    }
+    return headers, body
+
+
+def _search_items(query: str, n: int) -> Dict[str, Any]:
+    return {
+        "items": [
+            {"title": f"{query} {i}", "link": f"http://{query}/{i}"} for i in range(n)
+        ]
+    }
+
+
+def _mock_google(monkeypatch: pytest.MonkeyPatch, parts: List[Tuple[int, Any]]) -> None:
+    http = HttpMockSequence([_batch_response(parts)])
+    service = build("customsearch", "v1", http=http, developerKey="key")
+    monkeypatch.setattr(ws, "_google_service", lambda: (service, "cse-id"))
+
+
+@pytest.mark.unit
+def test_google_search_many(monkeypatch: pytest.MonkeyPatch) -> None:
+    error = {"error": {"code": 400, "message": "bad query"}}
+    _mock_google(
+        monkeypatch,
+        [
+            (200, _search_items("a", 2)),
+            (200, {}),  # no results: no "items"
+            (400, error),
+            (200, _search_items("d", 1)),
+        ],
+    )
+    results = ws.google_search_many(
+        [("a", 2), ("b", 2), ("c", 2), ("d", 1)], prefetch=False
+    )
+    # each query gets its own results, whatever the order of the responses
+    assert [[r.link for r in rs] for rs in results] == [
+        ["http://a/0", "http://a/1"],
+        [],
+        [],  # failed
+        ["http://d/0"],
+    ]
+
+
+@pytest.mark.unit
+def test_google_search_many_all_failed(monkeypatch: pytest.MonkeyPatch) -> None:
+    error = {"error": {"code": 403, "message": "quota exceeded"}}
+    _mock_google(monkeypatch, [(403, error), (403, error)])
+    with pytest.raises(HttpError):
+        ws.google_search_many([("a", 2), ("b", 2)], prefetch=False)
+    assert ws.google_search_many([]) == []
+
+
+@pytest.fixture
+def metaphor_client(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Iterator[ws.BatchedMetaphorClient]:
+    """BatchedMetaphorClient whose searches are stubbed out."""
+    started: List[str] = []
+
+    async def search(
+        session: aiohttp.ClientSession, query: str, num_results: int
+    ) -> List[ws.WebSearchResult]:
+        assert session is client._session
+        started.append(query)
+        if query.startswith("concurrent"):
+            # times out unless all 4 such searches run concurrently
+            async def all_started() -> None:
+                while len([q for q in started if q.startswith("concurrent")]) < 4:
+                    await asyncio.sleep(0.01)
+
+            await asyncio.wait_for(all_started(), timeout=5)
+        if query == "bad":
+            raise ValueError(query)
+        if query == "hang":
+            await asyncio.sleep(3600)
+        return [
+            ws.WebSearchResult(query, f"http://{query}/{i}", full_content="")
+            for i in range(num_results)
+        ]
+
+    monkeypatch.setattr(ws, "_ametaphor_search", search)
+    client = ws.BatchedMetaphorClient()
+    yield client
+    client.close()
+
+
+@pytest.mark.unit
+def test_batched_metaphor_client(metaphor_client: ws.BatchedMetaphorClient) -> None:
+    client = metaphor_client
+    queries = [f"concurrent {i}" for i in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda q: client.search(q, 2), queries))
+    # each caller gets the results of its own search
+    for query, query_results in zip(queries, results):
+        assert [r.link for r in query_results] == [
+            f"http://{query}/0",
+            f"http://{query}/1",
+        ]
+
+    with pytest.raises(ValueError, match="bad"):
+        client.search("bad")
+    # a failed search does not affect the others
+    assert len(asyncio.run(client.asearch("good", 3))) == 3
+
+
+@pytest.mark.unit
+def test_batched_metaphor_client_max_concurrent(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    in_flight: List[int] = [0]
+    max_in_flight: List[int] = [0]
+
+    async def search(
+        session: aiohttp.ClientSession, query: str, num_results: int
+    ) -> List[ws.WebSearchResult]:
+        in_flight[0] += 1
+        max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        await asyncio.sleep(0.05)
+        in_flight[0] -= 1
+        return []
+
+    monkeypatch.setattr(ws, "_ametaphor_search", search)
+    client = ws.BatchedMetaphorClient()
+    n = client.MAX_CONCURRENT * 2 + 1
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        results = list(executor.map(lambda i: client.search(str(i)), range(n)))
+    client.close()
+    assert results == [[]] * n
+    assert max_in_flight[0] == client.MAX_CONCURRENT
+
+
+@pytest.mark.unit
+def test_batched_metaphor_client_close(
+    metaphor_client: ws.BatchedMetaphorClient,
+) -> None:
+    client = metaphor_client
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(client.search, "hang")
+        time.sleep(0.1)
+        client.close()
+        # the blocked caller is released, instead of hanging forever
+        with pytest.raises(CancelledError):
+            pending.result(timeout=5)
+    client.close()  # idempotent
+    with pytest.raises(RuntimeError):
+        client.search("closed")